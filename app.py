@@ -1,15 +1,28 @@
 import os
+import io
+import glob
 import sqlite3
-import json
+import orjson
 import re
+import hashlib
+import asyncio
 import concurrent.futures
+import queue
 import time
-from flask import Flask, render_template, request, redirect, url_for, session, jsonify, Response
+from flask import Flask, render_template, request, redirect, url_for, session, jsonify, Response, stream_with_context
+from flask_compress import Compress
 from googleapiclient.discovery import build
 import yt_dlp
 import openai
+import httpx
+import numpy as np
+from faster_whisper import WhisperModel, BatchedInferencePipeline
+from faster_whisper.audio import decode_audio
+from faster_whisper.vad import VadOptions, get_speech_timestamps
+import av
 from dotenv import load_dotenv
 import logging
+import threading
 from threading import Lock
 
 # 로깅 설정
@@ -29,33 +42,137 @@ load_dotenv()
 # --- 설정 ---
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
-MAX_WORKERS = int(os.getenv("MAX_WORKERS", "1"))
+MAX_WORKERS = int(os.getenv("MAX_WORKERS", "4"))  # 동시에 음성 변환하는 영상 수
 DATABASE_PATH = os.getenv("DATABASE_PATH", "recipes.db")
 DATABASE_URL = os.getenv("DATABASE_URL")  # PostgreSQL URL
 FREE_TIER_LIMIT = 10  # 무료 사용자 제한
+MIN_DESCRIPTION_INGREDIENTS = 3  # 설명에 재료가 이 개수 이상이면 오디오 처리 생략
+RECOMMEND_LIMIT = 50  # 추천 결과 최대 개수
+WHISPER_BACKEND = os.getenv("WHISPER_BACKEND", "local")  # local(faster-whisper), transformers(GPU) 또는 openai(Whisper API)
+WHISPER_MODEL = os.getenv("WHISPER_MODEL", "medium")
+WHISPER_DEVICE = os.getenv("DEVICE", "cpu")  # cpu 또는 cuda
+WHISPER_DTYPE = os.getenv("WHISPER_DTYPE", "int8")  # GPU에서는 int8_float16 권장
+LLM_MODEL = "gpt-4o-mini"  # 프롬프트 캐싱 지원 모델
+TRANSCRIPT_CHARS = 1000  # LLM에 보내는 대본 길이 (VAD로 무음 구간이 빠진 대본 기준)
+WARMUP = os.getenv("WARMUP", "True").lower() == "true"  # 시작 시 모델/클라이언트 예열
+
+# 파이프라인 단계별 동시 처리 수 (다운로드 → 음성 변환 → 재료 추출)
+DOWNLOAD_WORKERS = max(1, int(os.getenv("DOWNLOAD_WORKERS", "4")))
+TRANSCRIBE_WORKERS = max(1, MAX_WORKERS)
+LLM_CONCURRENCY = max(1, int(os.getenv("LLM_CONCURRENCY", "20")))  # 동시에 보내는 LLM 요청 수 (모든 세션 합계, 공유 이벤트 루프 하나로 처리)
+PIPELINE_QUEUE_SIZE = max(1, int(os.getenv("PIPELINE_QUEUE_SIZE", "4")))  # 단계 사이 대기열 크기 (다운로드된 파일이 쌓이지 않도록)
+PLAYLIST_WORKERS = max(1, int(os.getenv("PLAYLIST_WORKERS", "4")))  # 동시에 처리하는 플레이리스트 수 (단계별 상한은 아래 세마포어가 전체 공유)
+SAVE_BATCH_SIZE = 5  # 추출이 끝난 레시피를 몇 개씩 묶어서 한 트랜잭션으로 저장할지
+
+# API별 동시 실행 상한 - 여러 플레이리스트가 동시에 처리돼도 전체 합이 넘지 않도록 모든 세션이 공유
+DOWNLOAD_SLOTS = threading.BoundedSemaphore(DOWNLOAD_WORKERS)
+TRANSCRIBE_SLOTS = threading.BoundedSemaphore(TRANSCRIBE_WORKERS)
+LLM_SLOTS = asyncio.Semaphore(LLM_CONCURRENCY)  # 공유 LLM 이벤트 루프(get_llm_loop) 안에서만 사용
+
+# 자주 쓰는 정규식 (모듈 로드 시 한 번만 컴파일)
+_RE_WS = re.compile(r'\s+')
+_RE_COMMA = re.compile(r',+')
+_RE_LIST = re.compile(r'list=([a-zA-Z0-9_-]+)')
+_RE_DESC_CLEAN = re.compile(r'[-\s]+')
+_RE_DESC_KEEP = re.compile(r'[^\w가-힣,]')
+# 설명의 재료 구간 끝 표시어: "만드는"은 어디서든, 그 밖의 조리 과정 제목은 줄 맨 앞에 올 때만
+# ("재료 (2인분 만들기 기준)", "[재료] 백종원 레시피 참고"처럼 재료 줄 안에 나오는 경우 제외)
+_RE_DESC_END = re.compile(r'만드는|^[ \t]*[\[(【<]?[ \t]*(?:만들기|조리법|조리 ?방법|레시피)', re.MULTILINE)
+_RE_SENTENCE_END = re.compile(r'[.!?。]')
 
 # API 키 검증
 if not OPENAI_API_KEY or not YOUTUBE_API_KEY:
     logger.error("API 키가 설정되지 않았습니다. .env 파일을 확인하세요.")
     raise ValueError("API keys not configured")
 
-client = openai.OpenAI(api_key=OPENAI_API_KEY)
-youtube = build("youtube", "v3", developerKey=YOUTUBE_API_KEY)
+# OpenAI HTTP 연결 풀 (기본 풀 크기로는 동시 요청이 많을 때 연결을 새로 맺게 됨, HTTP/2 로 한 연결에 요청 다중화)
+OPENAI_HTTP_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32)
+OPENAI_HTTP_TIMEOUT = httpx.Timeout(60.0, connect=5.0)
+
+client = openai.OpenAI(
+    api_key=OPENAI_API_KEY,
+    http_client=httpx.Client(http2=True, limits=OPENAI_HTTP_LIMITS, timeout=OPENAI_HTTP_TIMEOUT)
+)
 
 app = Flask(__name__)
 app.secret_key = os.getenv("SECRET_KEY", os.urandom(24))
+# HTML/JSON 응답 압축 (SSE 스트림은 대상 아님)
+# ETag 처리 순서를 맞추기 위해 자동 등록 대신 add_cache_headers 에서 직접 호출
+app.config['COMPRESS_MIMETYPES'] = ['text/html', 'application/json']
+app.config['COMPRESS_REGISTER'] = False
+compress = Compress(app)
 
 # 진행 상황 추적을 위한 전역 딕셔너리
 processing_status = {}
 status_lock = Lock()
+status_changed = threading.Condition(status_lock)  # 상태가 바뀌면 스트리밍 중인 클라이언트를 깨움
+STATUS_STREAM_HEARTBEAT = 15  # 초, 변화가 없을 때 연결 유지용 주석 전송 간격
+STATUS_STREAM_MAX_IDLE = 20  # 변화 없는 keep-alive 횟수 상한 (넘으면 스트림 종료, 클라이언트는 폴링으로 전환)
+# 동시에 열 수 있는 스트림 수 (gunicorn --threads 8 중 나머지는 일반 요청/폴링용으로 남김)
+STATUS_STREAM_LIMIT = 4
+status_stream_slots = threading.BoundedSemaphore(STATUS_STREAM_LIMIT)
 
 # --- 데이터베이스 함수 ---
+# 스레드별로 연결을 재사용 (요청마다 connect/close 반복 방지)
+_db_local = threading.local()
+db_write_lock = Lock()
+
 def get_db_connection():
-    """데이터베이스 연결"""
-    conn = sqlite3.connect(DATABASE_PATH)
-    conn.row_factory = sqlite3.Row
+    """데이터베이스 연결 (스레드별 영구 연결)"""
+    conn = getattr(_db_local, 'conn', None)
+    if conn is None:
+        conn = sqlite3.connect(DATABASE_PATH, check_same_thread=False, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.executescript("""
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            PRAGMA temp_store=MEMORY;
+            PRAGMA cache_size=-64000;
+            PRAGMA mmap_size=268435456;
+        """)
+        _db_local.conn = conn
     return conn
 
+def split_ingredients(ingredients):
+    """쉼표로 구분된 재료 문자열을 중복 없는 재료 목록으로 분리"""
+    return sorted(set(i.strip() for i in (ingredients or '').split(',') if i.strip()))
+
+def ingredients_to_json(ingredients):
+    """재료 목록을 저장용 JSON 배열 문자열로 변환"""
+    return orjson.dumps(split_ingredients(ingredients)).decode('utf-8')
+
+def index_recipe_ingredients(conn, recipe_id, ingredients):
+    """재료 역색인(ingredient_index)에 레시피 재료 등록"""
+    conn.executemany(
+        "INSERT OR IGNORE INTO ingredient_index (ingredient, recipe_id) VALUES (?, ?)",
+        [(ing, recipe_id) for ing in split_ingredients(ingredients)]
+    )
+
+fts_enabled = False
+
+def init_recipes_fts(conn):
+    """recipes.ingredients 를 색인하는 FTS5 테이블과 동기화 트리거 생성"""
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'recipes_fts'"
+    ).fetchone()
+    conn.executescript("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS recipes_fts USING fts5(
+            ingredients, content='recipes', content_rowid='id', tokenize='trigram'
+        );
+        CREATE TRIGGER IF NOT EXISTS recipes_fts_ai AFTER INSERT ON recipes BEGIN
+            INSERT INTO recipes_fts(rowid, ingredients) VALUES (new.id, new.ingredients);
+        END;
+        CREATE TRIGGER IF NOT EXISTS recipes_fts_ad AFTER DELETE ON recipes BEGIN
+            INSERT INTO recipes_fts(recipes_fts, rowid, ingredients) VALUES ('delete', old.id, old.ingredients);
+        END;
+        CREATE TRIGGER IF NOT EXISTS recipes_fts_au AFTER UPDATE ON recipes BEGIN
+            INSERT INTO recipes_fts(recipes_fts, rowid, ingredients) VALUES ('delete', old.id, old.ingredients);
+            INSERT INTO recipes_fts(rowid, ingredients) VALUES (new.id, new.ingredients);
+        END;
+    """)
+    if not exists:
+        conn.execute("INSERT INTO recipes_fts(recipes_fts) VALUES ('rebuild')")
+
 def init_database():
     """데이터베이스 초기화"""
     try:
@@ -70,9 +187,19 @@ def init_database():
                 ingredients TEXT,
                 dish_name TEXT,
                 url TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                ingredients_json TEXT
             )
         """)
+        # 기존 DB 마이그레이션: 분리된 재료 목록(JSON 배열) 컬럼 추가 및 채우기
+        columns = {row['name'] for row in cursor.execute("PRAGMA table_info(recipes)")}
+        if 'ingredients_json' not in columns:
+            cursor.execute("ALTER TABLE recipes ADD COLUMN ingredients_json TEXT")
+        cursor.execute("SELECT id, ingredients FROM recipes WHERE ingredients_json IS NULL")
+        cursor.executemany(
+            "UPDATE recipes SET ingredients_json = ? WHERE id = ?",
+            [(ingredients_to_json(row['ingredients']), row['id']) for row in cursor.fetchall()]
+        )
         cursor.execute("""
             CREATE INDEX IF NOT EXISTS idx_ingredients 
             ON recipes(ingredients)
@@ -81,25 +208,79 @@ def init_database():
             CREATE INDEX IF NOT EXISTS idx_video_id 
             ON recipes(video_id)
         """)
-        conn.commit()
-        conn.close()
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                dish_name TEXT,
+                ingredients TEXT
+            )
+        """)
+        # 재료 → 레시피 역색인 (추천 시 LIKE 전체 스캔 대신 인덱스 조회)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS ingredient_index (
+                ingredient TEXT NOT NULL,
+                recipe_id INTEGER NOT NULL,
+                PRIMARY KEY (ingredient, recipe_id)
+            ) WITHOUT ROWID
+        """)
+        
+        # 재료 부분 일치 검색용 FTS5 (trigram: "마늘" → "다진마늘")
+        global fts_enabled
+        try:
+            init_recipes_fts(conn)
+            fts_enabled = True
+        except sqlite3.OperationalError as e:
+            fts_enabled = False
+            logger.warning(f"FTS5 초기화 실패, 부분 일치 검색 비활성화: {e}")
+        
+        # 역색인이 없는 기존 레시피 채우기
+        cursor.execute("""
+            SELECT id, ingredients FROM recipes
+            WHERE id NOT IN (SELECT DISTINCT recipe_id FROM ingredient_index)
+        """)
+        for row in cursor.fetchall():
+            index_recipe_ingredients(conn, row['id'], row['ingredients'])
         logger.info("데이터베이스 초기화 완료")
     except Exception as e:
         logger.error(f"데이터베이스 초기화 실패: {e}")
 
+# 저장된 비디오 ID 메모리 캐시 (중복 체크마다 DB를 조회하지 않도록)
+KNOWN_IDS = set()
+known_ids_lock = Lock()
+
+def load_known_ids():
+    """저장된 비디오 ID를 한 번에 읽어 캐시 채우기"""
+    cursor = get_db_connection().cursor()
+    cursor.execute("SELECT video_id FROM recipes")
+    with known_ids_lock:
+        KNOWN_IDS.update(row[0] for row in cursor.fetchall())
+    logger.info(f"저장된 영상 {len(KNOWN_IDS)}개 로드")
+
+def add_known_id(video_id):
+    """저장 완료된 비디오 ID를 캐시에 추가"""
+    with known_ids_lock:
+        KNOWN_IDS.add(video_id)
+
+def get_existing_video_ids(video_ids):
+    """이미 저장된 비디오 ID 조회 (메모리 캐시)"""
+    with known_ids_lock:
+        return {v for v in video_ids if v in KNOWN_IDS}
+
 # 앱 시작 시 데이터베이스 초기화
 init_database()
-
-def check_if_video_exists(video_id):
-    """비디오 중복 체크"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT COUNT(*) FROM recipes WHERE video_id = ?", (video_id,))
-    exists = cursor.fetchone()[0] > 0
-    conn.close()
-    return exists
+load_known_ids()
 
 # --- YouTube 함수 ---
+_youtube_local = threading.local()
+
+def get_youtube():
+    """스레드별 YouTube API 클라이언트 (httplib2 는 스레드 안전하지 않음, 연결은 스레드 안에서 재사용)"""
+    youtube = getattr(_youtube_local, 'youtube', None)
+    if youtube is None:
+        youtube = build("youtube", "v3", developerKey=YOUTUBE_API_KEY)
+        _youtube_local.youtube = youtube
+    return youtube
+
 def get_playlist_items(playlist_id):
     """플레이리스트의 모든 비디오 ID 가져오기"""
     video_ids = []
@@ -107,11 +288,12 @@ def get_playlist_items(playlist_id):
     
     try:
         while True:
-            request = youtube.playlistItems().list(
+            request = get_youtube().playlistItems().list(
                 part="contentDetails",
                 playlistId=playlist_id,
                 maxResults=50,
-                pageToken=next_page_token
+                pageToken=next_page_token,
+                fields="nextPageToken,items/contentDetails/videoId"
             )
             response = request.execute()
             
@@ -129,50 +311,65 @@ def get_playlist_items(playlist_id):
         logger.error(f"플레이리스트 가져오기 실패: {e}")
         return []
 
-def get_video_info(video_id):
-    """비디오 정보 가져오기"""
-    try:
-        request = youtube.videos().list(part="snippet", id=video_id)
-        response = request.execute()
-        
-        if not response["items"]:
-            logger.warning(f"비디오 {video_id} 정보를 찾을 수 없음")
-            return None
-        
-        video = response["items"][0]
-        return {
-            'title': video["snippet"]["title"],
-            'description': video["snippet"]["description"],
-            'url': f"https://www.youtube.com/watch?v={video_id}"
-        }
-    except Exception as e:
-        logger.error(f"비디오 정보 가져오기 실패 ({video_id}): {e}")
-        return None
+def get_videos_info_bulk(video_ids):
+    """비디오 정보 일괄 가져오기 (videos.list 한 번에 최대 50개)"""
+    videos_info = {}
+    
+    for i in range(0, len(video_ids), 50):
+        chunk = video_ids[i:i + 50]
+        try:
+            # 필요한 필드만 받아 응답 크기 줄이기 (썸네일, 태그 등 제외)
+            request = get_youtube().videos().list(
+                part="snippet",
+                id=",".join(chunk),
+                fields="items(id,snippet(title,description))"
+            )
+            response = request.execute()
+            
+            for video in response.get("items", []):
+                video_id = video["id"]
+                videos_info[video_id] = {
+                    'title': video["snippet"]["title"],
+                    'description': video["snippet"]["description"],
+                    'url': f"https://www.youtube.com/watch?v={video_id}"
+                }
+        except Exception as e:
+            logger.error(f"비디오 정보 가져오기 실패 ({len(chunk)}개): {e}")
+    
+    missing = len(video_ids) - len(videos_info)
+    if missing:
+        logger.warning(f"{missing}개 비디오 정보를 찾을 수 없음")
+    return videos_info
 
 # --- 오디오 처리 함수 ---
+# mp3 재인코딩 없이 원본 오디오(opus/m4a)를 그대로 Whisper에 전달
+# 파일 이름은 영상 ID로 정해지므로 옵션은 모든 호출에서 같음
+YDL_OPTS = {
+    'format': 'bestaudio[abr<=64]/bestaudio',
+    'outtmpl': '%(id)s.%(ext)s',
+    'quiet': True,
+    'no_warnings': True,
+}
+_ydl_local = threading.local()
+
+def get_youtube_dl():
+    """스레드별 YoutubeDL 인스턴스 (추출기/옵션 초기화를 호출마다 반복하지 않도록)"""
+    ydl = getattr(_ydl_local, 'ydl', None)
+    if ydl is None:
+        ydl = yt_dlp.YoutubeDL(YDL_OPTS)
+        _ydl_local.ydl = ydl
+    return ydl
+
 def download_audio(video_url, video_id, max_retries=3):
     """YouTube 오디오 다운로드"""
     retries = 0
     
     while retries < max_retries:
         try:
-            ydl_opts = {
-                'format': 'bestaudio/best',
-                'outtmpl': f'{video_id}.%(ext)s',
-                'quiet': True,
-                'no_warnings': True,
-                'postprocessors': [{
-                    'key': 'FFmpegExtractAudio',
-                    'preferredcodec': 'mp3',
-                    'preferredquality': '128',
-                }],
-            }
-            
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            ydl = get_youtube_dl()
+            with DOWNLOAD_SLOTS:
                 info = ydl.extract_info(video_url, download=True)
-                downloaded_file = ydl.prepare_filename(info)
-                audio_file = downloaded_file.rsplit('.', 1)[0] + '.mp3'
-                return audio_file
+            return ydl.prepare_filename(info)
                 
         except Exception as e:
             retries += 1
@@ -181,84 +378,356 @@ def download_audio(video_url, video_id, max_retries=3):
                 time.sleep(5)
             else:
                 logger.error(f"다운로드 실패: {e}")
+                # 중단된 다운로드 조각 정리
+                for part_file in glob.glob(f"{glob.escape(video_id)}.*.part"):
+                    remove_audio_file(part_file)
                 raise
     
     return None
 
+_whisper_model = None
+_whisper_model_lock = Lock()
+
+def get_whisper_model():
+    """로컬 Whisper 모델 (faster-whisper) - 처음 사용할 때 한 번만 로드"""
+    global _whisper_model
+    with _whisper_model_lock:
+        if _whisper_model is None:
+            logger.info(f"Whisper 모델 로드 중: {WHISPER_MODEL}")
+            # 변환 워커 수만큼 병렬 추론 (워커마다 CPU 코어를 나눠 씀)
+            model = WhisperModel(
+                WHISPER_MODEL,
+                device=WHISPER_DEVICE,
+                compute_type=WHISPER_DTYPE,
+                cpu_threads=max(1, (os.cpu_count() or 1) // TRANSCRIBE_WORKERS),
+                num_workers=TRANSCRIBE_WORKERS
+            )
+            _whisper_model = BatchedInferencePipeline(model=model)
+        return _whisper_model
+
+_asr_pipeline = None  # None: 아직 확인 전, False: 사용 불가 (faster-whisper 사용)
+
+def get_asr_pipeline():
+    """GPU용 transformers Whisper 파이프라인 (CUDA나 torch/transformers가 없으면 None → faster-whisper 사용)
+    
+    torch/transformers는 GPU 서버에만 설치하므로 여기서 가져온다. 사용 불가 판단은 한 번만 한다.
+    """
+    global _asr_pipeline
+    with _whisper_model_lock:
+        if _asr_pipeline is None:
+            try:
+                import torch
+                from transformers import pipeline
+            except ImportError as e:
+                logger.warning(f"torch/transformers를 불러올 수 없어 faster-whisper로 변환합니다: {e}")
+                _asr_pipeline = False
+                return None
+            if not torch.cuda.is_available():
+                logger.warning("CUDA를 찾을 수 없어 faster-whisper로 변환합니다")
+                _asr_pipeline = False
+                return None
+            logger.info(f"transformers Whisper 파이프라인 로드 중: openai/whisper-{WHISPER_MODEL}")
+            _asr_pipeline = pipeline(
+                "automatic-speech-recognition",
+                model=f"openai/whisper-{WHISPER_MODEL}",
+                torch_dtype=torch.float16,
+                device="cuda:0",
+                model_kwargs={"attn_implementation": "sdpa"}
+            )
+        return _asr_pipeline or None
+
+# 무음/배경음악 구간(0.5초 이상)을 잘라내고 음성 구간만 변환 (Silero VAD)
+WHISPER_VAD_PARAMETERS = {"onset": 0.5, "min_silence_duration_ms": 500}
+# 설정이 잘못되면 변환할 때마다 조용히 실패하지 않도록 시작 시 한 번 검증
+WHISPER_VAD_OPTIONS = VadOptions(**WHISPER_VAD_PARAMETERS)
+SAMPLE_RATE = 16000
+
+def load_speech(file_path):
+    """오디오를 16kHz로 디코딩한 뒤 음성 구간만 이어 붙인 float32 배열 반환"""
+    audio = file_path if isinstance(file_path, np.ndarray) else decode_audio(file_path, sampling_rate=SAMPLE_RATE)
+    timestamps = get_speech_timestamps(audio, WHISPER_VAD_OPTIONS)
+    if not timestamps:
+        return audio[:0]
+    speech = np.concatenate([audio[t['start']:t['end']] for t in timestamps])
+    logger.info(f"VAD: {len(audio) / SAMPLE_RATE:.0f}초 중 {len(speech) / SAMPLE_RATE:.0f}초 음성")
+    return speech
+
+def encode_speech(audio):
+    """Whisper API 업로드용으로 음성 배열을 메모리에서 Opus(ogg)로 인코딩"""
+    buffer = io.BytesIO()
+    with av.open(buffer, mode="w", format="ogg") as container:
+        stream = container.add_stream("libopus", rate=SAMPLE_RATE)
+        stream.layout = "mono"
+        stream.bit_rate = 32000
+        frame = av.AudioFrame.from_ndarray(
+            (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16)[np.newaxis, :],
+            format="s16", layout="mono"
+        )
+        frame.sample_rate = SAMPLE_RATE
+        for packet in stream.encode(frame):
+            container.mux(packet)
+        for packet in stream.encode(None):
+            container.mux(packet)
+    buffer.name = "speech.ogg"
+    buffer.seek(0)
+    return buffer
+
 def transcribe_audio(file_path):
-    """Whisper API로 오디오 변환"""
+    """Whisper로 오디오 변환 (기본: 로컬 faster-whisper)
+    
+    file_path 대신 16kHz float32 배열도 받는다.
+    """
     try:
-        with open(file_path, "rb") as audio_file:
-            transcript = client.audio.transcriptions.create(
-                model="whisper-1",
-                file=audio_file,
-                language="ko"
+        with TRANSCRIBE_SLOTS:
+            if WHISPER_BACKEND == "openai":
+                # 무음 구간을 빼고 올려서 과금 시간(초 단위)과 변환 시간을 줄임
+                speech = load_speech(file_path)
+                if not len(speech):
+                    return ""
+                transcript = client.with_options(max_retries=2).audio.transcriptions.create(
+                    model="whisper-1",
+                    file=encode_speech(speech),
+                    language="ko"
+                )
+                return transcript.text
+            
+            if WHISPER_BACKEND == "transformers":
+                pipe = get_asr_pipeline()
+                if pipe is not None:
+                    speech = load_speech(file_path)
+                    if not len(speech):
+                        return ""
+                    # 30초 단위로 나눈 구간을 배치로 한 번에 추론
+                    result = pipe(
+                        {"raw": speech, "sampling_rate": SAMPLE_RATE},
+                        chunk_length_s=30,
+                        batch_size=24,
+                        return_timestamps=False,
+                        generate_kwargs={"language": "ko", "task": "transcribe"}
+                    )
+                    return result["text"].strip()
+            
+            segments, _ = get_whisper_model().transcribe(
+                file_path,
+                language="ko",
+                batch_size=8,
+                beam_size=1,
+                vad_filter=True,
+                vad_parameters=dict(WHISPER_VAD_PARAMETERS)  # 파이프라인이 dict 를 수정하므로 복사본 전달
             )
-        return transcript.text
+            return " ".join(segment.text.strip() for segment in segments)
     except Exception as e:
         logger.error(f"Whisper 변환 실패: {e}")
         raise
 
 # --- LLM 함수 ---
-def extract_recipe_info(transcript, title):
-    """LLM으로 레시피 정보 추출"""
-    prompt = f"""다음은 요리 영상 대본입니다. 요리 이름과 재료를 추출하세요.
+# 고정 프롬프트를 앞에, 대본을 마지막 메시지에 두어야 OpenAI 프롬프트 캐싱(1024토큰 이상 접두사)이 적용됨
+RECIPE_SYSTEM_PROMPT = """You are a recipe extraction assistant. Always respond with valid JSON only.
+
+당신은 한국어 요리 영상 대본에서 요리 이름과 재료를 추출하는 도우미입니다.
+사용자 메시지로 요리 영상의 음성 대본(자동 변환된 텍스트)이 주어집니다.
+대본에는 인사말, 채널 소개, 구독 요청, 광고, 잡담이 섞여 있을 수 있으니 요리와 관련된 내용만 보세요.
+음성 인식 오류로 재료 이름이 조금 틀리게 적혀 있을 수 있으니 문맥상 가장 자연스러운 재료 이름으로 고쳐서 적으세요.
 
 규칙:
-1. 요리 이름은 간단명료하게
+1. 요리 이름은 간단명료하게 (예: "김치찌개", "소고기미역국", "간장계란밥")
 2. 재료는 쉼표로만 구분, 공백 없이
 3. 기본 조미료(소금,후추,식용유 등)도 포함
+4. 분량, 단위, 손질 방법은 빼고 재료 이름만 적기 (예: "대파 1/2대 송송 썬 것" → "대파")
+5. 같은 재료는 한 번만 적기
+6. 재료 이름은 한국어로, 일반적으로 부르는 이름으로 적기 (예: "갈릭" → "마늘", "슈가" → "설탕")
+7. 양념장, 소스처럼 여러 재료를 섞은 것은 들어가는 재료를 각각 적기
+8. 대본에서 요리 이름을 알 수 없으면 주재료를 바탕으로 가장 가능성 높은 요리 이름을 적기
+9. 재료를 전혀 알 수 없으면 ingredients를 빈 문자열로 두기
+10. 설명, 마크다운, 코드 블록 없이 JSON 객체 하나만 응답하기
 
-대본: {transcript[:1500]}
+응답 형식 (JSON 스키마):
+{"dish_name": "요리이름", "ingredients": "재료1,재료2,재료3"}
+- dish_name: 문자열, 요리 이름
+- ingredients: 문자열, 쉼표로 구분된 재료 이름 목록 (공백 없음)
 
-다음 형식으로만 응답:
-{{"dish_name": "요리이름", "ingredients": "재료1,재료2,재료3"}}"""
+예시 1
+대본: 안녕하세요 여러분 오늘은 집에서 쉽게 만드는 김치찌개를 해볼게요. 먼저 돼지고기 앞다리살 200그램을 냄비에 넣고 식용유 조금 둘러서 볶아주세요. 고기가 익으면 잘 익은 김치 한 공기 넣고 같이 볶다가 고춧가루 한 스푼, 다진 마늘 반 스푼 넣어줍니다. 물 500미리 붓고 끓으면 두부 반 모 썰어 넣고 대파 송송 썰어 올려주세요. 간은 국간장이나 소금으로 맞춰주시면 됩니다. 구독과 좋아요 부탁드려요.
+응답: {"dish_name": "김치찌개", "ingredients": "돼지고기,김치,식용유,고춧가루,마늘,두부,대파,국간장,소금"}
 
-    try:
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are a recipe extraction assistant. Always respond with valid JSON only."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=300,
-            temperature=0.1
+예시 2
+대본: 오늘은 자취생도 5분이면 만드는 간장계란밥입니다. 팬에 버터 한 조각 녹이고 계란 두 개를 반숙으로 프라이 해주세요. 따뜻한 밥 위에 계란 올리고 진간장 한 스푼, 참기름 한 스푼 둘러주시고 깨소금 솔솔 뿌리면 끝이에요. 취향에 따라 김가루 올려 드셔도 맛있어요.
+응답: {"dish_name": "간장계란밥", "ingredients": "버터,계란,밥,진간장,참기름,깨소금,김가루"}
+
+예시 3
+대본: 이번 영상은 광고를 포함하고 있습니다. 자 오늘 만들 요리는 여름 별미 오이냉국이에요. 오이 한 개를 채 썰고 양파 4분의 1개도 얇게 채 썰어 주세요. 물 3컵에 국간장 2스푼, 식초 4스푼, 설탕 2스푼 넣고 잘 저어서 냉국물을 만들어요. 다진 마늘 조금이랑 청양고추, 홍고추 송송 썰어 넣고 통깨 뿌려서 얼음 띄워 드시면 됩니다.
+응답: {"dish_name": "오이냉국", "ingredients": "오이,양파,물,국간장,식초,설탕,마늘,청양고추,홍고추,통깨"}
+
+예시 4
+대본: 여러분 오늘은 일요일이니까 특별하게 까르보나라 해볼게요. 스파게티 면 100그램을 소금 넣은 물에 8분 삶아주시고요, 그동안 베이컨을 잘게 썰어서 올리브오일에 바삭하게 구워줍니다. 볼에 계란 노른자 두 개랑 파르메산 치즈 갈은 거 넣고 후추 넉넉히 뿌려서 섞어주세요. 면을 팬에 넣고 불을 끈 다음 소스를 넣고 면수 조금 넣어가면서 빠르게 섞어주면 완성입니다.
+응답: {"dish_name": "까르보나라", "ingredients": "스파게티면,소금,베이컨,올리브오일,계란노른자,파르메산치즈,후추"}
+
+예시 5
+대본: 네 반갑습니다 오늘은 밑반찬으로 좋은 어묵볶음이에요. 사각어묵 세 장을 먹기 좋게 자르고 양파 반 개 채 썰어 주세요. 팬에 식용유 두르고 양파랑 어묵 볶다가 양념장 넣을 건데요, 양념장은 간장 두 스푼, 물엿 한 스푼, 설탕 반 스푼, 다진 마늘 반 스푼 섞어주시면 돼요. 마지막에 참기름이랑 통깨 뿌려주세요.
+응답: {"dish_name": "어묵볶음", "ingredients": "어묵,양파,식용유,간장,물엿,설탕,마늘,참기름,통깨"}
+
+예시 6
+대본: 음 오늘은 좀 이야기를 많이 할 것 같은데요 요즘 날씨가 너무 추워서요. 자 그래서 뜨끈한 국물 요리 소고기미역국 준비했어요. 불린 미역을 참기름에 소고기 양지랑 같이 달달 볶다가 국간장 넣고 한 번 더 볶아주세요. 물 붓고 센 불에서 끓이다가 다진 마늘 넣고 중약불로 20분 푹 끓여주시면 되고요, 부족한 간은 소금으로 해주세요.
+응답: {"dish_name": "소고기미역국", "ingredients": "미역,참기름,소고기,국간장,물,마늘,소금"}
+
+이제 사용자가 보내는 대본에서 위 규칙과 형식대로 요리 이름과 재료를 추출하세요."""
+
+def truncate_transcript(transcript):
+    """LLM에 보낼 대본을 TRANSCRIPT_CHARS 이내의 문장 경계에서 자르기 (단어 중간에서 끊기지 않도록)"""
+    if len(transcript) <= TRANSCRIPT_CHARS:
+        return transcript
+    head = transcript[:TRANSCRIPT_CHARS]
+    cut = 0
+    for match in _RE_SENTENCE_END.finditer(head):
+        cut = match.end()
+    # 문장 부호가 없거나 너무 앞에 있으면 마지막 공백에서 자름
+    if cut < TRANSCRIPT_CHARS // 2:
+        cut = head.rfind(' ')
+    return head[:cut] if cut > 0 else head
+
+def llm_cache_key(transcript):
+    """LLM 캐시 키 (요청 설정 버전 + 정규화된 대본 해시)"""
+    normalized = _RE_WS.sub(' ', truncate_transcript(transcript)).strip().lower()
+    return hashlib.blake2b(f"{LLM_CACHE_VERSION}\0{normalized}".encode('utf-8'), digest_size=16).hexdigest()
+
+def get_cached_recipe_info(key):
+    """LLM 캐시 조회"""
+    cursor = get_db_connection().cursor()
+    cursor.execute("SELECT dish_name, ingredients FROM llm_cache WHERE key = ?", (key,))
+    row = cursor.fetchone()
+    return (row['dish_name'], row['ingredients']) if row else None
+
+def save_cached_recipe_info(key, dish_name, ingredients):
+    """LLM 캐시 저장"""
+    conn = get_db_connection()
+    with db_write_lock:
+        conn.execute(
+            "INSERT OR REPLACE INTO llm_cache (key, dish_name, ingredients) VALUES (?, ?, ?)",
+            (key, dish_name, ingredients)
         )
-        
-        result = response.choices[0].message.content.strip()
-        result = re.sub(r'^```json?\s*', '', result)
-        result = re.sub(r'\s*```$', '', result)
-        
-        data = json.loads(result)
-        dish_name = data.get('dish_name', title)
-        ingredients = data.get('ingredients', '')
-        
-        if isinstance(ingredients, list):
-            ingredients = ','.join(ingredients)
-        
-        ingredients = re.sub(r'\s+', '', ingredients)
-        ingredients = re.sub(r',+', ',', ingredients)
-        
-        return dish_name, ingredients
-        
-    except json.JSONDecodeError as e:
+
+def lookup_recipe_cache(transcript, title):
+    """LLM 캐시 조회 → (캐시 키, 캐시된 결과 또는 None)"""
+    cache_key = llm_cache_key(transcript)
+    try:
+        cached = get_cached_recipe_info(cache_key)
+        if cached:
+            logger.info(f"LLM 캐시 적중: {title}")
+        return cache_key, cached
+    except Exception as e:
+        logger.warning(f"LLM 캐시 조회 실패: {e}")
+        return cache_key, None
+
+def recipe_request_params(transcript):
+    """레시피 추출 요청 파라미터"""
+    return {
+        'model': LLM_MODEL,
+        'messages': [
+            {"role": "system", "content": RECIPE_SYSTEM_PROMPT},
+            {"role": "user", "content": f"대본: {truncate_transcript(transcript)}"}
+        ],
+        'response_format': {"type": "json_object"},
+        'max_tokens': 150,
+        'temperature': 0
+    }
+
+# 모델/프롬프트/요청 파라미터가 바뀌면 예전 설정으로 만든 캐시를 쓰지 않도록 캐시 키에 포함
+LLM_CACHE_VERSION = hashlib.blake2b(orjson.dumps(recipe_request_params("")), digest_size=8).hexdigest()
+
+def parse_recipe_response(response, title, cache_key):
+    """LLM 응답에서 요리 이름과 재료를 꺼내고 캐시에 저장"""
+    # 프롬프트 캐시 적중 여부 확인용
+    usage = getattr(response, 'usage', None)
+    details = getattr(usage, 'prompt_tokens_details', None)
+    if details is not None:
+        logger.info(f"LLM 프롬프트 토큰: {usage.prompt_tokens} (캐시: {getattr(details, 'cached_tokens', 0)})")
+    
+    # JSON 모드 응답이라 코드 블록 제거 없이 바로 파싱
+    result = response.choices[0].message.content
+    try:
+        data = orjson.loads(result)
+    except orjson.JSONDecodeError as e:
         logger.error(f"JSON 파싱 실패: {e}, 응답: {result[:200]}")
         return title, ""
+    
+    dish_name = data.get('dish_name', title)
+    ingredients = data.get('ingredients', '')
+    
+    if isinstance(ingredients, list):
+        ingredients = ','.join(ingredients)
+    
+    ingredients = _RE_WS.sub('', ingredients)
+    ingredients = _RE_COMMA.sub(',', ingredients)
+    
+    if ingredients:
+        try:
+            save_cached_recipe_info(cache_key, dish_name, ingredients)
+        except Exception as e:
+            logger.warning(f"LLM 캐시 저장 실패: {e}")
+    
+    return dish_name, ingredients
+
+async def extract_recipe_info(aclient, transcript, title):
+    """LLM으로 레시피 정보 추출 (같은 대본은 캐시에서 반환)
+    
+    공유 LLM 루프에서 실행되므로 캐시 조회/저장(SQLite, db_write_lock 대기)은 스레드에서 처리한다.
+    """
+    loop = asyncio.get_running_loop()
+    cache_key, cached = await loop.run_in_executor(None, lookup_recipe_cache, transcript, title)
+    if cached:
+        return cached
+    
+    try:
+        response = await aclient.chat.completions.create(**recipe_request_params(transcript))
+        return await loop.run_in_executor(None, parse_recipe_response, response, title, cache_key)
     except Exception as e:
         logger.error(f"LLM 추출 실패: {e}")
         return title, ""
 
+# 재료 추출(LLM 호출)은 모든 세션이 이벤트 루프 하나를 공유 (동시 요청 수 상한도 전체 공유)
+_llm_loop = None
+_llm_loop_lock = Lock()
+
+def get_llm_loop():
+    """LLM 호출용 이벤트 루프 (처음 쓸 때 백그라운드 스레드에서 시작)"""
+    global _llm_loop
+    with _llm_loop_lock:
+        if _llm_loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="llm-loop", daemon=True).start()
+            _llm_loop = loop
+        return _llm_loop
+
+_aclient = None
+
+def get_async_client():
+    """LLM 루프 전용 AsyncOpenAI 클라이언트 (HTTP/2 연결을 세션 간 재사용, 루프 스레드에서만 호출)"""
+    global _aclient
+    if _aclient is None:
+        _aclient = openai.AsyncOpenAI(
+            api_key=OPENAI_API_KEY,
+            http_client=httpx.AsyncClient(http2=True, limits=OPENAI_HTTP_LIMITS, timeout=OPENAI_HTTP_TIMEOUT)
+        )
+    return _aclient
+
+def find_ingredient_block(description):
+    """설명에서 재료 목록 구간 (시작, 끝) 찾기 - 첫 "재료" 뒤부터 끝 표시어까지"""
+    start_idx = description.find("재료")
+    if start_idx == -1:
+        return None
+    start_idx += len("재료")
+    match = _RE_DESC_END.search(description, start_idx)
+    return start_idx, match.start() if match else start_idx + 500
+
 def extract_from_description(description, title):
     """설명에서 재료 추출 (폴백 방법)"""
-    if "재료" in description:
-        start_idx = description.find("재료") + len("재료")
-        end_idx = description.find("만드는", start_idx)
-        if end_idx == -1:
-            end_idx = start_idx + 500
-        
+    block = find_ingredient_block(description)
+    if block:
+        start_idx, end_idx = block
         ingredients = description[start_idx:end_idx].strip()
-        ingredients = re.sub(r'[-\s\n]+', ',', ingredients)
-        ingredients = re.sub(r'[^\w가-힣,]', '', ingredients)
+        ingredients = _RE_DESC_CLEAN.sub(',', ingredients)
+        ingredients = _RE_DESC_KEEP.sub('', ingredients)
+        ingredients = _RE_COMMA.sub(',', ingredients).strip(',')
         return title, ingredients
     
     return title, ""
@@ -275,215 +744,291 @@ def update_status(session_id, current, total, status_text, video_title=""):
             'video_title': video_title,
             'timestamp': time.time()
         }
+        status_changed.notify_all()
 
 # --- 메인 처리 함수 ---
-def process_single_video(video_id, session_id, current_index, total_videos):
-    """단일 비디오 처리"""
+def remove_audio_file(audio_file):
+    """임시 오디오 파일 삭제 (재인코딩이 없으므로 다운로드한 파일 하나뿐)"""
+    try:
+        os.remove(audio_file)
+    except FileNotFoundError:
+        pass
+
+def recipe_from_description(job):
+    """설명에 재료 목록이 충분히 있으면 job['recipe'] 설정 (다운로드/음성 변환/LLM 생략)"""
+    title = job['info']['title']
+    if "재료" not in job['info']['description']:
+        return False
+    dish_name, ingredients = extract_from_description(job['info']['description'], title)
+    if len(ingredients.split(',')) < MIN_DESCRIPTION_INGREDIENTS:
+        return False
+    logger.info(f"설명에서 재료 발견, 오디오 처리 생략: {title}")
+    job['recipe'] = (dish_name, ingredients)
+    return True
+
+def download_stage(job):
+    """1단계: 오디오 다운로드 (실패 시 설명에서 추출하도록 표시)"""
+    job['audio_file'] = None
+    try:
+        job['audio_file'] = download_audio(job['info']['url'], job['video_id'])
+    except Exception as e:
+        logger.warning(f"오디오 처리 실패, 설명에서 추출 시도: {e}")
+
+def transcribe_stage(job):
+    """2단계: 음성을 텍스트로 변환"""
+    job['transcript'] = None
+    audio_file = job.get('audio_file')
+    if not audio_file:
+        return
+    try:
+        job['transcript'] = transcribe_audio(audio_file)
+    except Exception as e:
+        logger.warning(f"오디오 처리 실패, 설명에서 추출 시도: {e}")
+    finally:
+        remove_audio_file(audio_file)
+
+async def extract_stage(job, aclient):
+    """3단계: 재료 추출 (DB 저장은 save_recipes 에서 묶어서 처리)"""
+    title = job['info']['title']
     
-    # 중복 체크
-    if check_if_video_exists(video_id):
-        logger.info(f"[{video_id}] 이미 처리됨, 건너뜀")
-        update_status(session_id, current_index, total_videos, "이미 처리된 영상 건너뜀")
-        return {"status": "skipped", "video_id": video_id}
+    if job.get('recipe'):
+        dish_name, ingredients = job['recipe']
+    elif job.get('transcript'):
+        dish_name, ingredients = await extract_recipe_info(aclient, job['transcript'], title)
+    else:
+        dish_name, ingredients = extract_from_description(job['info']['description'], title)
     
-    try:
-        # 1. 비디오 정보 가져오기
-        update_status(session_id, current_index, total_videos, "영상 정보 가져오는 중...")
-        video_info = get_video_info(video_id)
-        if not video_info:
-            return {"status": "error", "video_id": video_id, "message": "비디오 정보 없음"}
-        
-        title = video_info['title']
-        description = video_info['description']
-        video_url = video_info['url']
-        
-        update_status(session_id, current_index, total_videos, "오디오 다운로드 중...", title)
-        logger.info(f"처리 시작: {title}")
-        
-        # 2. 오디오 다운로드 및 변환
+    if not ingredients:
+        logger.warning(f"재료 추출 실패: {title}")
+    job['recipe'] = (dish_name, ingredients)
+
+def save_recipes(jobs):
+    """추출이 끝난 job 들을 한 트랜잭션으로 DB 저장 후 각 job['result'] 설정"""
+    rows = {}
+    for job in jobs:
+        dish_name, ingredients = job['recipe']
+        info = job['info']
+        rows[job['video_id']] = (job['video_id'], info['title'], info['description'], ingredients,
+                                 dish_name, info['url'], ingredients_to_json(ingredients))
+    video_ids = list(rows)
+    placeholders = ','.join('?' * len(video_ids))
+    
+    # 레시피와 재료 색인을 한 트랜잭션으로 (커밋/fsync 는 묶음당 한 번)
+    conn = get_db_connection()
+    with db_write_lock:
+        conn.execute("BEGIN IMMEDIATE")
         try:
-            audio_file = download_audio(video_url, video_id)
-            
-            update_status(session_id, current_index, total_videos, "음성을 텍스트로 변환 중...", title)
-            transcript = transcribe_audio(audio_file)
-            
-            # 3. LLM으로 정보 추출
-            update_status(session_id, current_index, total_videos, "재료 추출 중...", title)
-            dish_name, ingredients = extract_recipe_info(transcript, title)
-            
-            # 임시 파일 삭제
-            if os.path.exists(audio_file):
-                os.remove(audio_file)
-            original_file = audio_file.rsplit('.', 1)[0]
-            for ext in ['.webm', '.m4a', '.opus']:
-                if os.path.exists(original_file + ext):
-                    os.remove(original_file + ext)
-                    
-        except Exception as e:
-            logger.warning(f"오디오 처리 실패, 설명에서 추출 시도: {e}")
-            update_status(session_id, current_index, total_videos, "설명에서 재료 추출 중...", title)
-            dish_name, ingredients = extract_from_description(description, title)
-        
-        # 4. DB 저장
-        if not ingredients:
-            logger.warning(f"재료 추출 실패: {title}")
-        
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO recipes (video_id, title, description, ingredients, dish_name, url)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (video_id, title, description, ingredients, dish_name, video_url))
-        conn.commit()
-        conn.close()
-        
-        update_status(session_id, current_index, total_videos, "완료!", title)
-        logger.info(f"저장 완료: {title}")
-        return {
+            existing = {row[0] for row in conn.execute(
+                f"SELECT video_id FROM recipes WHERE video_id IN ({placeholders})", video_ids
+            )}
+            new_ids = [video_id for video_id in video_ids if video_id not in existing]
+            conn.executemany("""
+                INSERT INTO recipes (video_id, title, description, ingredients, dish_name, url, ingredients_json)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, [rows[video_id] for video_id in new_ids])
+            if new_ids:
+                for recipe_id, video_id in conn.execute(
+                    f"SELECT id, video_id FROM recipes WHERE video_id IN ({','.join('?' * len(new_ids))})",
+                    new_ids
+                ).fetchall():
+                    index_recipe_ingredients(conn, recipe_id, rows[video_id][3])
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    
+    for job in jobs:
+        video_id = job['video_id']
+        add_known_id(video_id)
+        if video_id in existing:
+            logger.info(f"[{video_id}] 이미 처리됨, 건너뜀")
+            job['result'] = {"status": "skipped", "video_id": video_id}
+            continue
+        logger.info(f"저장 완료: {job['info']['title']}")
+        job['result'] = {
             "status": "success",
             "video_id": video_id,
-            "title": title,
-            "dish_name": dish_name
+            "title": job['info']['title'],
+            "dish_name": job['recipe'][0]
         }
-        
-    except Exception as e:
-        logger.error(f"비디오 처리 실패 ({video_id}): {e}")
-        update_status(session_id, current_index, total_videos, f"오류 발생: {str(e)[:50]}")
-        return {"status": "error", "video_id": video_id, "message": str(e)}
+    if new_ids:
+        invalidate_recipe_count()
+
+# 단계별 스레드 풀 (다운로드 → 음성 변환 → 재료 추출)은 실행마다 만들지 않고 계속 사용
+# → 스레드별 YoutubeDL 인스턴스가 플레이리스트 간에 재사용됨
+# 동시에 실행되는 파이프라인(최대 PLAYLIST_WORKERS개)이 모두 워커를 띄울 수 있는 크기
+STAGE_POOLS = [
+    concurrent.futures.ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS * PLAYLIST_WORKERS,
+                                          thread_name_prefix="download"),
+    concurrent.futures.ThreadPoolExecutor(max_workers=TRANSCRIBE_WORKERS * PLAYLIST_WORKERS,
+                                          thread_name_prefix="transcribe"),
+    concurrent.futures.ThreadPoolExecutor(max_workers=PLAYLIST_WORKERS, thread_name_prefix="extract"),
+]
+
+def process_videos_pipeline(jobs, session_id, done_count, total_videos):
+    """다운로드 → 음성 변환 → 재료 추출을 단계별로 겹쳐서 처리
+    
+    영상 N이 변환되는 동안 N+1은 다운로드, N-1은 재료 추출이 진행된다.
+    다운로드/변환은 스레드 풀, 재료 추출(LLM 호출)은 모든 세션이 공유하는 asyncio 이벤트 루프에서 처리한다.
+    """
+    to_download = queue.Queue()
+    to_transcribe = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    to_extract = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    progress = {'done': done_count}
+    progress_lock = Lock()
+    
+    def fail_job(job, e):
+        logger.error(f"비디오 처리 실패 ({job['video_id']}): {e}")
+        job['result'] = {"status": "error", "video_id": job['video_id'], "message": str(e)}
+    
+    def finish_job(job):
+        title = job['info']['title']
+        with progress_lock:
+            progress['done'] += 1
+            if job['result']['status'] == 'success':
+                update_status(session_id, progress['done'], total_videos, "완료!", title)
+            elif job['result']['status'] == 'skipped':
+                update_status(session_id, progress['done'], total_videos, "이미 처리된 영상 건너뜀", title)
+            else:
+                update_status(session_id, progress['done'], total_videos,
+                              f"오류 발생: {job['result']['message'][:50]}")
+    
+    def stage_worker(stage, status_text, inbox, outbox):
+        while True:
+            job = inbox.get()
+            if job is None:
+                break
+            if not job.get('result'):
+                update_status(session_id, progress['done'], total_videos, status_text, job['info']['title'])
+                try:
+                    stage(job)
+                except Exception as e:
+                    fail_job(job, e)
+            outbox.put(job)
+    
+    pending = []  # DB 저장 대기 중인 job (LLM 루프에서만 접근)
+    
+    async def flush():
+        batch = pending[:]
+        pending.clear()
+        if not batch:
+            return
+        try:
+            # DB 쓰기 잠금/busy 대기 동안 다른 LLM 요청이 멈추지 않도록 스레드에서 실행
+            await asyncio.get_running_loop().run_in_executor(None, save_recipes, batch)
+        except Exception as e:
+            for job in batch:
+                fail_job(job, e)
+        for job in batch:
+            finish_job(job)
+    
+    async def handle(job):
+        if not job.get('result'):
+            async with LLM_SLOTS:
+                update_status(session_id, progress['done'], total_videos, "재료 추출 중...", job['info']['title'])
+                try:
+                    await extract_stage(job, get_async_client())
+                except Exception as e:
+                    fail_job(job, e)
+        if job.get('result'):
+            finish_job(job)
+            return
+        pending.append(job)
+        if len(pending) >= SAVE_BATCH_SIZE:
+            await flush()
+    
+    def extract_worker(inbox):
+        # 재료 추출은 공유 LLM 루프에 넘기고 이 스레드는 대기열만 비움
+        loop = get_llm_loop()
+        futures = []
+        try:
+            while True:
+                job = inbox.get()
+                if job is None:
+                    break
+                futures.append(asyncio.run_coroutine_threadsafe(handle(job), loop))
+            concurrent.futures.wait(futures)
+        finally:
+            asyncio.run_coroutine_threadsafe(flush(), loop).result()
+    
+    # (워커 수, 입력 큐, 워커 함수)
+    stages = [
+        (DOWNLOAD_WORKERS, to_download,
+         lambda: stage_worker(download_stage, "오디오 다운로드 중...", to_download, to_transcribe)),
+        (TRANSCRIBE_WORKERS, to_transcribe,
+         lambda: stage_worker(transcribe_stage, "음성을 텍스트로 변환 중...", to_transcribe, to_extract)),
+        (1, to_extract, lambda: extract_worker(to_extract)),
+    ]
+    
+    futures = [
+        [pool.submit(worker) for _ in range(workers)]
+        for pool, (workers, _, worker) in zip(STAGE_POOLS, stages)
+    ]
+    try:
+        # 설명만으로 재료를 얻은 영상은 다운로드 대기열을 거치지 않고 바로 저장 단계로
+        for job in jobs:
+            logger.info(f"처리 시작: {job['info']['title']}")
+            (to_extract if recipe_from_description(job) else to_download).put(job)
+    finally:
+        # 앞 단계 워커가 모두 끝나면 다음 단계에 종료 신호 전달 (공용 풀 스레드가 대기 상태로 남지 않도록 항상)
+        for (workers, inbox, _), stage_futures in zip(stages, futures):
+            for _ in range(workers):
+                inbox.put(None)
+            concurrent.futures.wait(stage_futures)
+    
+    return [job['result'] for job in jobs]
 
 # --- Flask 라우트 ---
-@app.route('/')
-def index():
-    """메인 페이지"""
+# 메인 페이지 레시피 수 캐시 (COUNT(*) 쿼리를 매 요청마다 하지 않도록)
+RECIPE_COUNT_TTL = 10  # 초
+_recipe_count_cache = {'value': None, 'expires': 0.0}
+
+def get_recipe_count():
+    """저장된 레시피 수 (짧은 TTL로 캐시)"""
+    now = time.monotonic()
+    if _recipe_count_cache['value'] is not None and now < _recipe_count_cache['expires']:
+        return _recipe_count_cache['value']
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        cursor = get_db_connection().cursor()
         cursor.execute("SELECT COUNT(*) FROM recipes")
         count = cursor.fetchone()[0]
-        conn.close()
     except Exception as e:
         logger.error(f"데이터베이스 조회 오류: {e}")
-        count = 0
-    
-    return f'''
-        <!DOCTYPE html>
-        <html lang="ko">
-        <head>
-            <meta charset="UTF-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <title>레시피 추출 시스템</title>
-            <style>
-                body {{
-                    font-family: 'Segoe UI', sans-serif;
-                    max-width: 800px;
-                    margin: 50px auto;
-                    padding: 20px;
-                    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                    min-height: 100vh;
-                }}
-                .container {{
-                    background: white;
-                    padding: 40px;
-                    border-radius: 20px;
-                    box-shadow: 0 20px 60px rgba(0,0,0,0.3);
-                }}
-                h1 {{
-                    color: #333;
-                    text-align: center;
-                    margin-bottom: 10px;
-                }}
-                .subtitle {{
-                    text-align: center;
-                    color: #666;
-                    margin-bottom: 30px;
-                }}
-                .stats {{
-                    background: #e3f2fd;
-                    padding: 20px;
-                    border-radius: 10px;
-                    margin: 20px 0;
-                    text-align: center;
-                }}
-                .stats-number {{
-                    font-size: 36px;
-                    font-weight: bold;
-                    color: #667eea;
-                }}
-                .limit-notice {{
-                    background: #fff3cd;
-                    border-left: 4px solid #ffc107;
-                    padding: 15px;
-                    margin: 20px 0;
-                    border-radius: 5px;
-                }}
-                input[type="text"] {{
-                    width: 100%;
-                    padding: 15px;
-                    margin: 10px 0;
-                    border: 2px solid #ddd;
-                    border-radius: 10px;
-                    box-sizing: border-box;
-                    font-size: 16px;
-                }}
-                input[type="text"]:focus {{
-                    outline: none;
-                    border-color: #667eea;
-                }}
-                button {{
-                    width: 100%;
-                    padding: 15px;
-                    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                    color: white;
-                    border: none;
-                    border-radius: 10px;
-                    cursor: pointer;
-                    font-size: 18px;
-                    font-weight: bold;
-                    transition: transform 0.2s;
-                }}
-                button:hover {{
-                    transform: translateY(-2px);
-                    box-shadow: 0 5px 15px rgba(102, 126, 234, 0.4);
-                }}
-                .link {{
-                    display: block;
-                    text-align: center;
-                    margin-top: 20px;
-                    color: #667eea;
-                    text-decoration: none;
-                    font-weight: bold;
-                }}
-                .link:hover {{
-                    text-decoration: underline;
-                }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <h1>🍳 유튜브 레시피 추출 시스템</h1>
-                <p class="subtitle">AI가 요리 영상을 분석하여 레시피를 추출합니다</p>
-                
-                <div class="stats">
-                    <div class="stats-number">{count}</div>
-                    <div>개의 레시피가 저장되어 있습니다</div>
-                </div>
-                
-                <div class="limit-notice">
-                    <strong>⚡ 무료 버전 제한:</strong> 한 번에 최대 10개의 영상까지 처리할 수 있습니다.
-                </div>
-                
-                <form method="post" action="/process">
-                    <label for="playlist_url"><strong>플레이리스트 URL:</strong></label>
-                    <input type="text" id="playlist_url" name="playlist_url" 
-                           placeholder="https://www.youtube.com/playlist?list=..." required>
-                    <button type="submit">🚀 영상 처리 시작</button>
-                </form>
-                
-                <a href="/recommend" class="link">📋 레시피 추천받기 →</a>
-            </div>
-        </body>
-        </html>
-    '''
+        return 0
+    _recipe_count_cache.update(value=count, expires=now + RECIPE_COUNT_TTL)
+    return count
+
+def invalidate_recipe_count():
+    """레시피 저장 후 캐시 무효화"""
+    _recipe_count_cache['expires'] = 0.0
+
+# HTTP 캐시 헤더 (메인 페이지는 브라우저/프록시 캐시, HTML/JSON 은 ETag 로 304 응답)
+INDEX_CACHE_MAX_AGE = 60  # 초
+
+@app.after_request
+def add_cache_headers(response):
+    """GET 200 응답에 캐시 헤더 추가 후 압축
+    
+    ETag 는 원본 본문으로 계산하고(gzip 결과는 매번 달라짐), 압축하면서 붙는
+    ":gzip" 같은 접미사까지 포함된 ETag 로 If-None-Match 를 비교한다.
+    """
+    conditional = (request.method == 'GET' and response.status_code == 200
+                   and not response.is_streamed
+                   and response.mimetype in app.config['COMPRESS_MIMETYPES'])
+    if conditional:
+        if request.endpoint == 'index':
+            response.cache_control.public = True
+            response.cache_control.max_age = INDEX_CACHE_MAX_AGE
+        response.add_etag(weak=True)
+    response = compress.after_request(response)
+    if conditional:
+        response.make_conditional(request)
+    return response
+
+@app.route('/')
+def index():
+    """메인 페이지"""
+    return render_template('index.html', count=get_recipe_count())
 
 @app.route('/process', methods=['POST'])
 def process_playlist():
@@ -493,7 +1038,7 @@ def process_playlist():
     if not playlist_url:
         return "플레이리스트 URL을 입력하세요.", 400
     
-    match = re.search(r'list=([a-zA-Z0-9_-]+)', playlist_url)
+    match = _RE_LIST.search(playlist_url)
     if not match:
         return "유효하지 않은 플레이리스트 URL입니다.", 400
     
@@ -505,6 +1050,12 @@ def process_playlist():
     
     return redirect(url_for('process_playlist_manual', playlist_id=playlist_id, session_id=session_id))
 
+def new_video_ids(video_ids):
+    """플레이리스트 내 중복과 이미 저장된 영상 제외 (무료 한도가 새 영상에만 쓰이도록)"""
+    video_ids = list(dict.fromkeys(video_ids))
+    existing = get_existing_video_ids(video_ids)
+    return [v for v in video_ids if v not in existing]
+
 @app.route('/process_playlist/<playlist_id>')
 def process_playlist_manual(playlist_id):
     """플레이리스트 처리 실행"""
@@ -516,7 +1067,8 @@ def process_playlist_manual(playlist_id):
     if not video_ids:
         return "플레이리스트를 불러올 수 없습니다.", 400
     
-    # 무료 버전 제한: 10개로 제한
+    # 무료 버전 제한: 새 영상 10개로 제한
+    video_ids = new_video_ids(video_ids)
     original_count = len(video_ids)
     if len(video_ids) > FREE_TIER_LIMIT:
         video_ids = video_ids[:FREE_TIER_LIMIT]
@@ -532,10 +1084,20 @@ def process_playlist_manual(playlist_id):
                          limited=limited,
                          playlist_id=playlist_id)
 
+# 플레이리스트 처리는 요청마다 스레드를 새로 만들지 않고 공용 풀에서 실행 (넘치는 요청은 대기)
+playlist_executor = concurrent.futures.ThreadPoolExecutor(max_workers=PLAYLIST_WORKERS,
+                                                          thread_name_prefix="playlist")
+
+def log_playlist_error(future):
+    """백그라운드 처리 중 처리되지 않은 예외 기록"""
+    e = future.exception()
+    if e is not None:
+        logger.error(f"플레이리스트 처리 오류: {e}", exc_info=e)
+
 @app.route('/start_processing/<playlist_id>/<session_id>')
 def start_processing(playlist_id, session_id):
     """실제 처리 시작 (백그라운드)"""
-    video_ids = get_playlist_items(playlist_id)
+    video_ids = new_video_ids(get_playlist_items(playlist_id))
     
     if len(video_ids) > FREE_TIER_LIMIT:
         video_ids = video_ids[:FREE_TIER_LIMIT]
@@ -546,10 +1108,29 @@ def start_processing(playlist_id, session_id):
     # 백그라운드에서 처리
     def process_videos():
         results = []
-        for idx, video_id in enumerate(video_ids, 1):
-            result = process_single_video(video_id, session_id, idx, len(video_ids))
-            results.append(result)
-            time.sleep(1)  # API 제한 방지
+        total_videos = len(video_ids)
+        
+        # 중복 체크 (목록을 만든 뒤 다른 세션이 저장했을 수 있음)
+        existing = get_existing_video_ids(video_ids)
+        pending_ids = [v for v in video_ids if v not in existing]
+        if existing:
+            logger.info(f"이미 처리된 영상 {len(existing)}개 건너뜀")
+            update_status(session_id, len(existing), total_videos, "이미 처리된 영상 건너뜀")
+        
+        # 비디오 정보 일괄 조회 (50개 단위)
+        update_status(session_id, len(existing), total_videos, "영상 정보 가져오는 중...")
+        videos_info = get_videos_info_bulk(pending_ids)
+        
+        jobs = []
+        for video_id in pending_ids:
+            video_info = videos_info.get(video_id)
+            if not video_info:
+                results.append({"status": "error", "video_id": video_id, "message": "비디오 정보 없음"})
+                continue
+            jobs.append({'video_id': video_id, 'info': video_info})
+        
+        done_count = len(existing) + len(results)
+        results.extend(process_videos_pipeline(jobs, session_id, done_count, total_videos))
         
         # 완료 상태
         success_count = sum(1 for r in results if r.get('status') == 'success')
@@ -557,11 +1138,10 @@ def start_processing(playlist_id, session_id):
             processing_status[session_id]['completed'] = True
             processing_status[session_id]['success_count'] = success_count
             processing_status[session_id]['total'] = len(video_ids)
+            status_changed.notify_all()
     
-    import threading
-    thread = threading.Thread(target=process_videos)
-    thread.daemon = True
-    thread.start()
+    future = playlist_executor.submit(process_videos)
+    future.add_done_callback(log_playlist_error)
     
     return jsonify({"status": "started"})
 
@@ -579,11 +1159,92 @@ def get_status(session_id):
         })
     return jsonify(status)
 
+@app.route('/status_stream/<session_id>')
+def status_stream(session_id):
+    """진행 상황 스트리밍 (Server-Sent Events) - 상태가 바뀔 때만 전송
+    
+    모르는 세션(서버 재시작 등)이거나 스트림 수가 상한이면 204 → 브라우저는 재연결하지 않고 폴링으로 전환.
+    상태 변화 없이 오래 열려 있으면 스트림을 닫아 gunicorn 스레드를 붙잡지 않는다.
+    """
+    with status_lock:
+        if session_id not in processing_status:
+            return Response(status=204)
+    if not status_stream_slots.acquire(blocking=False):
+        return Response(status=204)
+    
+    def generate():
+        last = None
+        idle = 0
+        while True:
+            with status_lock:
+                status_changed.wait_for(lambda: processing_status.get(session_id) != last,
+                                        timeout=STATUS_STREAM_HEARTBEAT)
+                current = processing_status.get(session_id)
+                current = dict(current) if current else None
+            if current is None:
+                break
+            if current == last:
+                idle += 1
+                if idle >= STATUS_STREAM_MAX_IDLE:
+                    break
+                yield ": keep-alive\n\n"
+                continue
+            idle = 0
+            last = current
+            yield f"data: {orjson.dumps(current).decode('utf-8')}\n\n"
+            if current.get('completed'):
+                break
+    
+    response = Response(stream_with_context(generate()),
+                        mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    # 응답이 끝나거나 클라이언트가 끊으면 자리 반환
+    response.call_on_close(status_stream_slots.release)
+    return response
+
 @app.route('/recommend')
 def recommend_page():
     """추천 페이지"""
     return render_template('recommend.html')
 
+def find_candidate_recipes(ingredients, limit):
+    """추천 후보 레시피를 쿼리 한 번으로 조회
+    
+    - 역색인: 정확히 일치하는 재료가 많은 순
+    - FTS5(trigram): 부분 일치 (예: "다진마늘"), bm25 순
+    - trigram 색인은 3글자 이상만 찾을 수 있으므로 짧은 재료는 LIKE로 검색
+    """
+    long_terms = [i for i in ingredients if len(i) >= 3]
+    short_terms = [i for i in ingredients if len(i) < 3]
+    
+    subqueries = [f"""
+        SELECT recipe_id FROM (
+            SELECT recipe_id FROM ingredient_index
+            WHERE ingredient IN ({",".join("?" * len(ingredients))})
+            GROUP BY recipe_id ORDER BY COUNT(*) DESC LIMIT ?
+        )"""]
+    params = list(ingredients) + [limit]
+    if long_terms and fts_enabled:
+        subqueries.append("""
+        SELECT rowid FROM (
+            SELECT rowid FROM recipes_fts WHERE recipes_fts MATCH ?
+            ORDER BY bm25(recipes_fts) LIMIT ?
+        )""")
+        params += [" OR ".join('"' + t.replace('"', '""') + '"' for t in long_terms), limit]
+    if short_terms:
+        subqueries.append(f"""
+        SELECT id FROM (
+            SELECT id FROM recipes WHERE {" OR ".join("ingredients LIKE ?" for _ in short_terms)} LIMIT ?
+        )""")
+        params += [f"%{t}%" for t in short_terms] + [limit]
+    
+    cursor = get_db_connection().cursor()
+    cursor.execute(
+        f"SELECT title, url, dish_name, ingredients_json FROM recipes WHERE id IN ({' UNION '.join(subqueries)})",
+        params
+    )
+    return cursor.fetchall()
+
 @app.route('/recommend', methods=['POST'])
 def recommend_recipe():
     """레시피 추천"""
@@ -592,18 +1253,11 @@ def recommend_recipe():
     if not user_ingredients_input:
         return render_template('recommend.html', message="재료를 입력해주세요.")
     
-    user_ingredients = set(i.strip() for i in user_ingredients_input.split(',') if i.strip())
-    
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    conditions = " OR ".join(["ingredients LIKE ?" for _ in user_ingredients])
-    values = [f"%{ing}%" for ing in user_ingredients]
+    user_ingredients = set(split_ingredients(user_ingredients_input))
+    if not user_ingredients:
+        return render_template('recommend.html', message="재료를 입력해주세요.")
     
-    query = f"SELECT * FROM recipes WHERE {conditions}"
-    cursor.execute(query, values)
-    results = cursor.fetchall()
-    conn.close()
+    results = find_candidate_recipes(user_ingredients, RECOMMEND_LIMIT)
     
     if not results:
         return render_template('recommend.html', 
@@ -611,9 +1265,12 @@ def recommend_recipe():
     
     recipes = []
     for row in results:
-        recipe_ings = set(i.strip() for i in row['ingredients'].split(',') if i.strip())
-        matched = user_ingredients & recipe_ings
-        missing = recipe_ings - user_ingredients
+        recipe_ings = frozenset(orjson.loads(row['ingredients_json'] or '[]'))
+        # 정확히 일치하는 재료 + 손질/수식어가 앞에 붙은 재료 (예: "마늘" → "다진마늘")
+        # 한 글자 재료는 정확히 일치할 때만 ("김" ≠ "김치", "배" ≠ "배추")
+        matched = {r for r in recipe_ings
+                   if r in user_ingredients or any(len(u) >= 2 and r.endswith(u) for u in user_ingredients)}
+        missing = recipe_ings - matched
         
         match_rate = (len(matched) / len(recipe_ings) * 100) if recipe_ings else 0
         
@@ -621,13 +1278,14 @@ def recommend_recipe():
             'title': row['title'],
             'url': row['url'],
             'dish_name': row['dish_name'],
-            'match_rate': f"{match_rate:.1f}",
+            'match_rate': match_rate,
             'matched': ', '.join(matched),
             'missing': ', '.join(missing),
             'all_ingredients': ', '.join(recipe_ings)
         })
     
-    recipes.sort(key=lambda x: float(x['match_rate']), reverse=True)
+    recipes.sort(key=lambda x: x['match_rate'], reverse=True)
+    recipes = recipes[:RECOMMEND_LIMIT]
     
     return render_template('recommend.html', 
                          recipes=recipes, 
@@ -636,13 +1294,45 @@ def recommend_recipe():
 @app.route('/api/stats')
 def api_stats():
     """통계 API"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT COUNT(*) as total FROM recipes")
-    total = cursor.fetchone()[0]
-    conn.close()
+    return jsonify({"total_recipes": get_recipe_count()})
+
+# --- 예열 ---
+def warmup():
+    """첫 요청이 모델 로드/TLS 연결/템플릿 컴파일 비용을 떠안지 않도록 미리 실행"""
+    started = time.monotonic()
+    for template in ('index.html', 'processing.html', 'recommend.html'):
+        app.jinja_env.get_template(template)
+    
+    async def warm_llm_client():
+        # 재료 추출이 실제로 쓰는 LLM 루프의 클라이언트로 연결 (모델 조회는 과금 없음)
+        await get_async_client().models.retrieve(LLM_MODEL)
     
-    return jsonify({"total_recipes": total})
+    # YouTube 클라이언트는 스레드별이라 여기서 연결해도 처리 스레드에는 도움이 안 되므로 생략
+    steps = [
+        ("OpenAI", lambda: asyncio.run_coroutine_threadsafe(warm_llm_client(), get_llm_loop()).result()),
+    ]
+    if WHISPER_BACKEND == "openai":
+        # Whisper API는 동기 클라이언트 사용
+        steps.append(("Whisper API", lambda: client.models.retrieve("whisper-1")))
+    else:
+        # 1초 무음으로 모델 로드 및 첫 추론 준비
+        steps.append(("Whisper", lambda: transcribe_audio(np.zeros(16000, dtype=np.float32))))
+    
+    for name, step in steps:
+        try:
+            step()
+        except Exception as e:
+            logger.warning(f"{name} 예열 실패: {e}")
+    logger.info(f"예열 완료 ({time.monotonic() - started:.1f}초)")
+
+# gunicorn은 __main__ 블록을 실행하지 않으므로 모듈 로드 시 시작
+# python app.py 를 디버그 모드로 실행하면 Werkzeug 리로더 부모 프로세스도 이 모듈을 실행하므로
+# 실제 서버 프로세스(WERKZEUG_RUN_MAIN)에서만 예열 (모델 중복 로드/유료 API 중복 호출 방지)
+_reloader_parent = (__name__ == '__main__'
+                    and os.getenv("DEBUG", "True").lower() == "true"
+                    and os.getenv("WERKZEUG_RUN_MAIN") != "true")
+if WARMUP and not _reloader_parent:
+    threading.Thread(target=warmup, daemon=True).start()
 
 if __name__ == '__main__':
     init_database()